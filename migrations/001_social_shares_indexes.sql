@@ -0,0 +1,24 @@
+-- Indexes used by the social shares scripts.
+--
+-- ix_ss_coverage_id backs the ON CONFLICT (coverage_id) upserts and lets the
+-- "records without social data" lookup run as an index anti-join. Apply this
+-- before running either script: without a unique index on coverage_id every
+-- upsert batch fails, and both scripts refuse to start.
+-- ix_cl_created_desc serves the backfill's ORDER BY created_at DESC LIMIT N
+-- over non-deleted coverage without sorting the whole table.
+--
+-- Check the plan before and after with, for example:
+--   EXPLAIN (ANALYZE, BUFFERS)
+--   SELECT cl.id FROM agentcy_client_coverage_log cl
+--   WHERE NOT EXISTS (
+--       SELECT 1 FROM agentcy_client_coverage_social_shares ss WHERE ss.coverage_id = cl.id
+--   )
+--   AND cl.url IS NOT NULL AND cl.deleted = false
+--   ORDER BY cl.created_at DESC LIMIT 10;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_ss_coverage_id
+    ON agentcy_client_coverage_social_shares (coverage_id);
+
+CREATE INDEX IF NOT EXISTS ix_cl_created_desc
+    ON agentcy_client_coverage_log (created_at DESC)
+    WHERE deleted = false;
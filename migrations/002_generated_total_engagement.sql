@@ -0,0 +1,26 @@
+-- Make total_social_engagement_count a stored generated column so it can never
+-- drift from its components. The scripts no longer write this column.
+--
+-- Rewrites agentcy_client_coverage_social_shares; run during a quiet period.
+
+BEGIN;
+
+ALTER TABLE agentcy_client_coverage_social_shares
+    DROP COLUMN total_social_engagement_count;
+
+ALTER TABLE agentcy_client_coverage_social_shares
+    ADD COLUMN total_social_engagement_count BIGINT GENERATED ALWAYS AS (
+        x_tweet_count +
+        x_bookmark_count +
+        x_favorite_count +
+        x_quote_count +
+        x_reply_count +
+        x_retweet_count +
+        reddit_count +
+        facebook_share_count +
+        facebook_comment_count +
+        facebook_reaction_count +
+        pinterest_count
+    ) STORED;
+
+COMMIT;
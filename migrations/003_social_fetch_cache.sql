@@ -0,0 +1,15 @@
+-- Cache of SharedCount and X responses, keyed by coverage URL.
+--
+-- update_recent_social_shares.py reuses a row while fetched_at is within its
+-- cache TTL, so syndicated coverage sharing a URL and back-to-back runs don't
+-- spend API quota on the same URL twice. A row is only overwritten when the
+-- new fetch reports at least as much engagement (or the row has expired), so
+-- a flaky API response can't replace good counts with lower ones.
+
+CREATE TABLE IF NOT EXISTS social_fetch_cache (
+    url TEXT PRIMARY KEY,
+    sharedcount_json JSONB NOT NULL,
+    x_json JSONB NOT NULL,
+    total_engagement BIGINT NOT NULL DEFAULT 0,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,60 @@
+-- Engagement history for the trending report.
+--
+-- agentcy_client_coverage_social_shares holds one row per coverage item, so it
+-- can't say how much engagement grew. A trigger records a snapshot of the
+-- total whenever a row is inserted or its total changes (timestamp-only
+-- refreshes are not recorded), and the covering index lets
+-- show_trending_coverage find each item's last snapshot before a point in
+-- time with an index-only scan.
+--
+-- Existing rows are seeded with their current total as of their updated_at.
+-- The total is nullable like the generated column it copies (002), which is
+-- NULL whenever any platform count is NULL; the trending report treats a NULL
+-- baseline as 0 and skips coverage whose current total is NULL.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS agentcy_client_coverage_social_shares_history (
+    id BIGSERIAL PRIMARY KEY,
+    coverage_id BIGINT NOT NULL,
+    total_social_engagement_count BIGINT,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_ssh_coverage_recorded
+    ON agentcy_client_coverage_social_shares_history (coverage_id, recorded_at DESC)
+    INCLUDE (total_social_engagement_count);
+
+CREATE OR REPLACE FUNCTION snapshot_social_shares() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO agentcy_client_coverage_social_shares_history
+        (coverage_id, total_social_engagement_count, recorded_at)
+    VALUES
+        (NEW.coverage_id, NEW.total_social_engagement_count, NOW());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS snapshot_social_insert ON agentcy_client_coverage_social_shares;
+CREATE TRIGGER snapshot_social_insert
+    AFTER INSERT ON agentcy_client_coverage_social_shares
+    FOR EACH ROW EXECUTE FUNCTION snapshot_social_shares();
+
+DROP TRIGGER IF EXISTS snapshot_social_update ON agentcy_client_coverage_social_shares;
+CREATE TRIGGER snapshot_social_update
+    AFTER UPDATE ON agentcy_client_coverage_social_shares
+    FOR EACH ROW
+    WHEN (OLD.total_social_engagement_count IS DISTINCT FROM NEW.total_social_engagement_count)
+    EXECUTE FUNCTION snapshot_social_shares();
+
+INSERT INTO agentcy_client_coverage_social_shares_history
+    (coverage_id, total_social_engagement_count, recorded_at)
+SELECT ss.coverage_id, ss.total_social_engagement_count, COALESCE(ss.updated_at, NOW())
+FROM agentcy_client_coverage_social_shares ss
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM agentcy_client_coverage_social_shares_history h
+    WHERE h.coverage_id = ss.coverage_id
+);
+
+COMMIT;
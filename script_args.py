@@ -0,0 +1,19 @@
+"""
+Script Args
+argparse value types shared by the daily updater and the backfill script
+
+Usage:
+    from script_args import positive_int
+
+    parser.add_argument("--workers", type=positive_int, default=8)
+"""
+
+import argparse
+
+
+def positive_int(value):
+    """argparse type for options that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
@@ -0,0 +1,250 @@
+"""
+Social Fetchers
+Shared SharedCount and X (Twitter) API clients used by the daily updater and the
+backfill and test scripts in supporting scripts/
+
+Usage:
+    from social_fetchers import build_session, fetch_sharedcount, fetch_x
+
+    session = build_session()
+    facebook_data, reddit_count, pinterest_count = fetch_sharedcount(session, url, api_key)
+    x_data = fetch_x(session, url, api_key)
+
+Both fetchers raise on a failed request (after the session's retries) instead of
+returning zeros, so callers can decide whether to skip, defer or report the URL.
+"""
+
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    # orjson is optional; the stdlib parser accepts bytes as well
+    from json import loads as json_loads
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional; without it X responses are parsed in full
+    ijson = None
+
+try:
+    import redis
+except ImportError:
+    # Only needed for RedisRateLimiter
+    redis = None
+
+SHAREDCOUNT_URL = 'https://api.sharedcount.com/v1.0/'
+TWITTER_API_HOST = 'twitter-api45.p.rapidapi.com'
+TWITTER_SEARCH_URL = f'https://{TWITTER_API_HOST}/search.php'
+
+# Response headers that report how many requests are left in the current window
+RATE_LIMIT_REMAINING_HEADERS = ('X-RateLimit-Remaining', 'X-RateLimit-Requests-Remaining')
+
+
+def build_session(pool_maxsize=50):
+    """Create a pooled HTTP session that keeps connections alive between requests
+
+    pool_maxsize is the number of keep-alive connections kept per host; size it
+    to the number of threads sharing the session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1.0,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+    session.mount('https://', adapter)
+    return session
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace requests to an API"""
+
+    def __init__(self, rate_per_sec, burst):
+        self.base_rate = rate_per_sec
+        self.rate = rate_per_sec
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping only while the bucket is empty"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+    def observe(self, headers):
+        """Slow down while the API reports its remaining quota is running low"""
+        for header in RATE_LIMIT_REMAINING_HEADERS:
+            remaining = headers.get(header)
+            if remaining is not None:
+                break
+        else:
+            return
+
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+
+        with self.lock:
+            # Never allow more requests than the API says are left
+            self.tokens = min(self.tokens, remaining)
+
+            if remaining < self.capacity:
+                self.rate = max(self.base_rate / 10, self.rate / 2)
+            else:
+                self.rate = min(self.base_rate, self.rate * 2)
+
+
+class RedisRateLimiter:
+    """Rate limit shared by every process using the same Redis, in one-second windows
+
+    Drop-in replacement for TokenBucket when several worker processes must stay
+    within one API plan together.
+    """
+
+    def __init__(self, redis_url, api, rate_per_sec):
+        if redis is None:
+            raise RuntimeError("The redis package is required for a shared rate limit (pip install redis)")
+
+        self.client = redis.Redis.from_url(redis_url)
+        self.api = api
+        self.rate = max(1, int(rate_per_sec))
+
+    def acquire(self):
+        """Take a slot in the current window, sleeping until the next one when it is full"""
+        while True:
+            now = time.time()
+            window = int(now)
+            key = f"url_rate:{self.api}:{window}"
+
+            pipe = self.client.pipeline()
+            pipe.incr(key)
+            pipe.expire(key, 2)
+            count, _ = pipe.execute()
+
+            if count <= self.rate:
+                return
+
+            time.sleep(window + 1 - now)
+
+    def observe(self, headers):
+        """Windows are fixed, so rate-limit headers are not used"""
+
+
+def fetch_sharedcount(session, url, api_key, bucket=None):
+    """Get (facebook_data, reddit_count, pinterest_count) for url from SharedCount"""
+    if bucket:
+        bucket.acquire()
+
+    response = session.get(
+        SHAREDCOUNT_URL,
+        params={'url': url, 'apikey': api_key},
+        timeout=30
+    )
+    if bucket:
+        bucket.observe(response.headers)
+
+    if response.status_code != 200:
+        raise Exception(f"SharedCount API error: {response.status_code}")
+
+    data = json_loads(response.content)
+
+    # Extract metrics with defaults
+    reddit_count = data.get('Reddit', 0) or 0
+    facebook_data = {
+        'share_count': data.get('Facebook', {}).get('share_count', 0) or 0,
+        'comment_count': data.get('Facebook', {}).get('comment_count', 0) or 0,
+        'reaction_count': data.get('Facebook', {}).get('reaction_count', 0) or 0
+    }
+    pinterest_count = data.get('Pinterest', 0) or 0
+
+    return facebook_data, reddit_count, pinterest_count
+
+
+def fetch_x(session, url, api_key, bucket=None):
+    """Get summed X (Twitter) engagement for tweets mentioning url"""
+    if bucket:
+        bucket.acquire()
+
+    headers = {
+        'x-rapidapi-key': api_key,
+        'x-rapidapi-host': TWITTER_API_HOST
+    }
+
+    response = session.get(
+        TWITTER_SEARCH_URL,
+        params={'query': url},
+        headers=headers,
+        timeout=30,
+        stream=True
+    )
+
+    try:
+        if bucket:
+            bucket.observe(response.headers)
+
+        if response.status_code != 200:
+            raise Exception(f"X (Twitter) API error: {response.status_code}")
+
+        if ijson:
+            # Decode tweets one at a time off the socket instead of
+            # materializing the whole timeline
+            response.raw.decode_content = True
+            timeline = ijson.items(response.raw, 'timeline.item')
+        else:
+            timeline = json_loads(response.content).get("timeline", [])
+
+        # One row of counters per tweet (missing or null counts become 0)
+        rows = [
+            (
+                1,
+                tweet.get("bookmarks", 0) or 0,
+                tweet.get("favorites", 0) or 0,
+                tweet.get("quotes", 0) or 0,
+                tweet.get("replies", 0) or 0,
+                tweet.get("retweets", 0) or 0
+            )
+            for tweet in timeline
+            if tweet.get("type") == "tweet"
+        ]
+    finally:
+        response.close()
+
+    # Sum each column in a single pass
+    if rows:
+        tweets, bookmarks, favorites, quotes, replies, retweets = map(sum, zip(*rows))
+    else:
+        tweets = bookmarks = favorites = quotes = replies = retweets = 0
+
+    return {
+        'tweets': tweets,
+        'bookmarks': bookmarks,
+        'favorites': favorites,
+        'quotes': quotes,
+        'replies': replies,
+        'retweets': retweets
+    }
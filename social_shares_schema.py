@@ -0,0 +1,69 @@
+"""
+Social Shares Schema
+Checks for the migrations the daily updater and the backfill script rely on
+
+Usage:
+    from social_shares_schema import schema_problems
+
+    problems = schema_problems(conn)  # [] when everything is in place
+
+Works with both psycopg (the updater) and psycopg2 (the backfill) connections. It
+only reads the catalogs, and leaves committing or rolling back to the caller.
+"""
+
+# ON CONFLICT (coverage_id) needs a unique, non-partial index on coverage_id
+COVERAGE_ID_UNIQUE_SQL = """
+    SELECT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'agentcy_client_coverage_social_shares'::regclass
+        AND i.indisunique
+        AND i.indnkeyatts = 1
+        AND i.indpred IS NULL
+        AND a.attname = 'coverage_id'
+    )
+"""
+
+# The scripts never write total_social_engagement_count; it must be the stored
+# generated column from migration 002, or totals silently go stale
+GENERATED_TOTAL_SQL = """
+    SELECT EXISTS (
+        SELECT 1
+        FROM pg_attribute
+        WHERE attrelid = 'agentcy_client_coverage_social_shares'::regclass
+        AND attname = 'total_social_engagement_count'
+        AND attgenerated = 's'
+        AND NOT attisdropped
+    )
+"""
+
+# (check query, problem reported when it returns false)
+SCHEMA_CHECKS = (
+    (
+        COVERAGE_ID_UNIQUE_SQL,
+        "No unique index on agentcy_client_coverage_social_shares.coverage_id; "
+        "apply migrations/001_social_shares_indexes.sql"
+    ),
+    (
+        GENERATED_TOTAL_SQL,
+        "agentcy_client_coverage_social_shares.total_social_engagement_count is not a generated column; "
+        "apply migrations/002_generated_total_engagement.sql"
+    ),
+)
+
+
+def schema_problems(conn):
+    """Describe each required migration missing from conn's database"""
+    problems = []
+    cur = conn.cursor()
+
+    try:
+        for sql, problem in SCHEMA_CHECKS:
+            cur.execute(sql)
+            if not cur.fetchone()[0]:
+                problems.append(problem)
+    finally:
+        cur.close()
+
+    return problems
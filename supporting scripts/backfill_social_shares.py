@@ -4,89 +4,469 @@ Backfill Social Shares Script
 Fetches social media engagement metrics for existing coverage records
 
 Usage:
-    python backfill_social_shares.py [--limit N] [--client CLIENT_ID] [--ids ID1 ID2 ID3...]
+    python backfill_social_shares.py [--limit N] [--client CLIENT_ID] [--ids ID1 ID2 ID3...] [--no-cache] [--workers N] [--verbose]
 
 Options:
     --limit N         Process only N records (default: 10)
     --client ID       Process only records for specific client ID
     --ids             Specific coverage IDs to process
+    --no-cache        Always call the APIs instead of reusing cached responses
+    --workers N       Split the run across N processes, sharded by coverage ID (default: 1)
+    --verbose         Log per-record details
 """
 
 import argparse
 import sys
 import os
 import time
-import requests
-import http.client
-import urllib.parse
+import threading
+import hashlib
 import json
+import sqlite3
+import csv
+import io
+import logging
+import queue
+import math
+import multiprocessing
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, Counter
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from psycopg2.extras import execute_values, NamedTupleCursor
+
+# The API clients, schema checks and argument types live at the repository root, next to the daily updater
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from social_fetchers import build_session, TokenBucket, RedisRateLimiter, fetch_sharedcount, fetch_x
+from social_shares_schema import schema_problems
+from script_args import positive_int
 
 # Add parent directory to path to import project modules
 sys.path.append('../')
 from config.database import connect_db
 
+logger = logging.getLogger("backfill_social_shares")
+
+# Number of pending rows written per batch
+BATCH_SIZE = 1000
+
+# Number of API requests allowed in flight at once
+N_PARALLEL = 8
+
+# Fetch jobs and fetched results held in memory at once; producers block beyond this
+FETCH_QUEUE_SIZE = 2000
+
+# Rows pulled from the server-side cursor per round trip
+STREAM_CHUNK_SIZE = 1000
+
+# Per-API request budgets as (requests per second, burst), tuned to each plan
+SHAREDCOUNT_RATE_LIMIT = (5, 10)
+TWITTER_RATE_LIMIT = (2, 5)
+
+# When set, every worker process draws from one shared budget per API in Redis;
+# otherwise each of N workers gets 1/N of the budget
+REDIS_URL = os.environ.get("REDIS_URL")
+
+# API response cache, shared between runs
+CACHE_PATH = os.environ.get(
+    "SOCIAL_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "social_shares_cache.sqlite3")
+)
+CACHE_TTL_SECONDS = 24 * 60 * 60
+CACHE_MEMORY_SIZE = 4096
+
+# Log records waiting for the background writer; callers block when it is full
+LOG_QUEUE_SIZE = 10000
+
+# Columns written for each coverage record, in pending-row order
+SHARES_COLUMNS = """
+        coverage_id,
+        x_tweet_count,
+        x_bookmark_count,
+        x_favorite_count,
+        x_quote_count,
+        x_reply_count,
+        x_retweet_count,
+        reddit_count,
+        facebook_share_count,
+        facebook_comment_count,
+        facebook_reaction_count,
+        pinterest_count
+"""
+
+ON_CONFLICT_UPDATE = """
+    ON CONFLICT (coverage_id) DO UPDATE SET
+        x_tweet_count = EXCLUDED.x_tweet_count,
+        x_bookmark_count = EXCLUDED.x_bookmark_count,
+        x_favorite_count = EXCLUDED.x_favorite_count,
+        x_quote_count = EXCLUDED.x_quote_count,
+        x_reply_count = EXCLUDED.x_reply_count,
+        x_retweet_count = EXCLUDED.x_retweet_count,
+        reddit_count = EXCLUDED.reddit_count,
+        facebook_share_count = EXCLUDED.facebook_share_count,
+        facebook_comment_count = EXCLUDED.facebook_comment_count,
+        facebook_reaction_count = EXCLUDED.facebook_reaction_count,
+        pinterest_count = EXCLUDED.pinterest_count,
+        updated_at = NOW()
+"""
+
+# Multi-row upsert; execute_values expands the VALUES placeholder one page at a time
+UPSERT_SQL = f"""
+    INSERT INTO agentcy_client_coverage_social_shares ({SHARES_COLUMNS})
+    VALUES %s
+    {ON_CONFLICT_UPDATE}
+"""
+
+# Fast path for the default backfill, whose records have no shares row yet:
+# COPY into a temp table and merge with one INSERT ... SELECT (the ON CONFLICT
+# still covers a row another run wrote meanwhile)
+COPY_TEMP_TABLE_SQL = f"""
+    CREATE TEMP TABLE shares_tmp ON COMMIT DROP AS
+    SELECT {SHARES_COLUMNS}
+    FROM agentcy_client_coverage_social_shares
+    WITH NO DATA
+"""
+
+COPY_SQL = f"COPY shares_tmp ({SHARES_COLUMNS}) FROM STDIN WITH CSV"
+
+COPY_UPSERT_SQL = f"""
+    INSERT INTO agentcy_client_coverage_social_shares ({SHARES_COLUMNS})
+    SELECT {SHARES_COLUMNS} FROM shares_tmp
+    {ON_CONFLICT_UPDATE}
+"""
+
+
+class BlockingQueueHandler(QueueHandler):
+    """QueueHandler that waits for room in a bounded queue instead of dropping records"""
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+
+class BlockingQueueListener(QueueListener):
+    """QueueListener whose stop sentinel also waits for room in the queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def setup_logging(verbose=False, prefix=""):
+    """Send log output through a bounded queue drained by a background thread"""
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(prefix + "%(message)s"))
+
+    # Worker processes inherit the parent's handler, whose queue nothing drains there
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    logger.addHandler(BlockingQueueHandler(log_queue))
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    logger.propagate = False
+
+    listener = BlockingQueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+class ResponseCache:
+    """API results keyed by URL: an in-memory LRU in front of a SQLite table with a TTL"""
+
+    def __init__(self, path, ttl_seconds=CACHE_TTL_SECONDS, maxsize=CACHE_MEMORY_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        # Worker processes share the file, so wait out each other's write locks
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS api_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self.db.execute("DELETE FROM api_cache WHERE expires_at <= ?", (time.time(),))
+        self.db.commit()
+
+    @staticmethod
+    def _key(api, url):
+        return f"{api}:{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def get(self, api, url):
+        """Return the cached result for url, or None on a miss"""
+        key = self._key(api, url)
+
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return self.memory[key]
+
+            row = self.db.execute(
+                "SELECT value FROM api_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value = json.loads(row[0])
+            self._remember(key, value)
+            self.hits += 1
+            return value
+
+    def set(self, api, url, value):
+        """Store a successful API result for url"""
+        key = self._key(api, url)
+
+        with self.lock:
+            self._remember(key, value)
+            self.db.execute(
+                "INSERT OR REPLACE INTO api_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl_seconds)
+            )
+            self.db.commit()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return (self.hits / lookups) * 100 if lookups else 0.0
+
+    def close(self):
+        self.db.close()
+
 
 class SocialSharesBackfiller:
-    def __init__(self, limit=10, client_id=None, coverage_ids=None):
+    def __init__(self, limit=10, client_id=None, coverage_ids=None, use_cache=True, shard=None):
         self.limit = limit
         self.client_id = client_id
         self.coverage_ids = coverage_ids
+
+        # (index, count): only handle records whose id % count == index
+        self.shard = shard
         self.processed = 0
         self.succeeded = 0
         self.failed = 0
         self.skipped = 0
+        self.deferred = 0
+
+        # Rows waiting to be written by the next batched upsert
+        self._pending = []
+
+        # Pooled HTTP sessions, one per API host
+        self.sc_session = build_session()
+        self.x_session = build_session()
+
+        # Request pacing, one limiter per API
+        self.sc_bucket = self._rate_limiter('sharedcount', *SHAREDCOUNT_RATE_LIMIT)
+        self.x_bucket = self._rate_limiter('x', *TWITTER_RATE_LIMIT)
+
+        # Responses for URLs fetched recently, including by earlier runs
+        self.cache = ResponseCache(CACHE_PATH) if use_cache else None
+
+        # The main thread streams records on self.conn while the writer thread
+        # commits batches on its own connection, so neither thread can abort or
+        # roll back the other's transaction
+        self.conn = connect_db()
+        self.write_conn = connect_db()
+
+        # API Keys from environment
+        self.sharedcount_api_key = os.environ.get("SHAREDCOUNT_API_KEY")
+        self.twitter_api_key = os.environ.get("TWITTER_API_KEY")
+
+        if not self.sharedcount_api_key:
+            logger.warning("⚠️  SHAREDCOUNT_API_KEY not set in environment")
+        if not self.twitter_api_key:
+            logger.warning("⚠️  TWITTER_API_KEY not set in environment")
+
+    def _rate_limiter(self, api, rate_per_sec, burst):
+        """Share the API budget across worker processes"""
+        if REDIS_URL:
+            return RedisRateLimiter(REDIS_URL, api, rate_per_sec)
+
+        workers = self.shard[1] if self.shard else 1
+        return TokenBucket(rate_per_sec / workers, max(1, burst // workers))
+
+    def __enter__(self):
+        return self
 
-        # API Keys
-        self.sharedcount_api_key = os.environ.get("SHAREDCOUNT_API_KEY", "c6d646fe157ec581c6be340efe64ddc1da90a729")
-        self.twitter_api_key = os.environ.get("TWITTER_API_KEY", "eee06f1a70msh557ec3461344c08p1221adjsn1edc35b871d6")
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
 
-    def run(self):
+    def close(self):
+        """Release the database connections, HTTP sessions and cache"""
+        self.conn.close()
+        self.write_conn.close()
+        self.sc_session.close()
+        self.x_session.close()
+        if self.cache:
+            self.cache.close()
+
+    def run(self, summary=True):
         """Main execution method"""
-        print(f"🚀 Starting Social Shares Backfill")
-        print(f"{'=' * 60}")
+        logger.info("🚀 Starting Social Shares Backfill")
+        logger.info("=" * 60)
 
         if self.coverage_ids:
-            print(f"Coverage IDs: {', '.join(map(str, self.coverage_ids))}")
+            logger.info("Coverage IDs: %s", ', '.join(map(str, self.coverage_ids)))
         else:
-            print(f"Limit: {self.limit} records")
+            logger.info("Limit: %s records", self.limit)
             if self.client_id:
-                print(f"Client ID filter: {self.client_id}")
+                logger.info("Client ID filter: %s", self.client_id)
+
+        if self.shard:
+            logger.info("Shard: id %% %d = %d", self.shard[1], self.shard[0])
 
-        print(f"SharedCount API Key: {'✅ Configured' if self.sharedcount_api_key else '❌ Missing'}")
-        print(f"Twitter API Key: {'✅ Configured' if self.twitter_api_key else '❌ Missing'}")
-        print(f"{'=' * 60}\n")
+        logger.info("SharedCount API Key: %s", '✅ Configured' if self.sharedcount_api_key else '❌ Missing')
+        logger.info("Twitter API Key: %s", '✅ Configured' if self.twitter_api_key else '❌ Missing')
+        logger.info("Response cache: %s", CACHE_PATH if self.cache else 'Disabled')
+        logger.info("%s\n", "=" * 60)
 
-        # Get records to process
+        self.check_schema()
+
+        # Fetch jobs are submitted chunk by chunk as the cursor yields rows
         records = self.get_records_to_process()
+        found = 0
+        unique_urls = 0
 
-        if not records:
-            print("✅ No records found that need social shares data")
-            return
+        # Fetchers hand results to a single writer thread, so database
+        # writes overlap with the API calls still in flight
+        results = queue.Queue(maxsize=FETCH_QUEUE_SIZE)
+        in_flight = threading.BoundedSemaphore(FETCH_QUEUE_SIZE)
+        writer = threading.Thread(target=self._write_results, args=(results,), name="backfill-writer")
+        writer.start()
 
-        print(f"📋 Found {len(records)} records to process\n")
+        try:
+            # The token buckets keep each API within its budget
+            with ThreadPoolExecutor(max_workers=N_PARALLEL) as executor:
+                try:
+                    for chunk in iter(lambda: list(islice(records, STREAM_CHUNK_SIZE)), []):
+                        found += len(chunk)
+
+                        # Syndicated articles share a URL; fetch each URL once for all its records
+                        by_url = defaultdict(list)
+                        for record in chunk:
+                            by_url[record.url].append(record)
+                        unique_urls += len(by_url)
+
+                        for url, url_records in by_url.items():
+                            # Bound the number of fetches queued in memory; released
+                            # once the URL's results are handed to the writer
+                            in_flight.acquire()
+
+                            # Each URL's SharedCount and X requests run in parallel
+                            self.join_fetches(url_records, (
+                                executor.submit(self.get_sharedcount_data, url),
+                                executor.submit(self.get_x_data, url)
+                            ), results, in_flight)
+                except KeyboardInterrupt:
+                    # Up to FETCH_QUEUE_SIZE URLs can be queued; cancel them so the
+                    # writer drains what has arrived and stops
+                    executor.shutdown(cancel_futures=True)
+                    raise
+        finally:
+            results.put(None)
+            writer.join()
 
-        # Process each record
-        for record in records:
-            self.process_record(record)
+        if not found:
+            logger.info("✅ No records found that need social shares data")
+            return
 
-            # Rate limiting between requests
-            if self.processed < len(records):
-                time.sleep(1)  # 1 second between requests
+        if unique_urls < found:
+            logger.info("🔗 %d unique URLs across %d records", unique_urls, found)
 
         # Show summary
-        self.show_summary()
+        if summary:
+            self.show_summary()
+
+    def check_schema(self):
+        """Fail before fetching anything if a migration the writes rely on is missing"""
+        problems = schema_problems(self.conn)
+
+        if problems:
+            # Raised rather than exiting so sharded worker processes report it too
+            raise RuntimeError("; ".join(problems))
+
+    def join_fetches(self, url_records, futures, results, in_flight):
+        """Queue a URL's (SharedCount, X) results for the writer once both fetches finish"""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+
+            try:
+                sharedcount_future, x_future = futures
+                if sharedcount_future.cancelled() or x_future.cancelled():
+                    # Interrupted before both requests ran
+                    return
+
+                error = sharedcount_future.exception() or x_future.exception()
+                if error is not None:
+                    results.put((url_records, None, None, error))
+                else:
+                    results.put((url_records, sharedcount_future.result(), x_future.result(), None))
+            finally:
+                in_flight.release()
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def _write_results(self, results):
+        """Writer thread: turn fetched metrics into rows and flush them in batches"""
+        while True:
+            item = results.get()
+            if item is None:
+                break
+
+            url_records, sharedcount_result, x_data, error = item
+
+            if error is not None:
+                # Leave the records for a later run rather than writing zeros
+                for record in url_records:
+                    self.processed += 1
+                    self.deferred += 1
+                    logger.warning("⏭️  Deferred ID %s (%s): %s", record.id, record.url, error)
+                continue
+
+            for record in url_records:
+                self.process_record(record, sharedcount_result, x_data)
+
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush_batch()
+
+        # Write whatever is left over
+        self._flush_batch()
 
     def get_records_to_process(self):
-        """Get coverage records that don't have social shares data yet"""
+        """Yield coverage records that don't have social shares data yet"""
         if self.coverage_ids:
-            print(f"🔍 Fetching specific coverage records: {', '.join(map(str, self.coverage_ids))}...")
+            logger.info("🔍 Fetching specific coverage records: %s...", ', '.join(map(str, self.coverage_ids)))
         else:
-            print("🔍 Querying database for records needing social shares data...")
+            logger.info("🔍 Querying database for records needing social shares data...")
 
-        conn = connect_db()
-        cur = conn.cursor()
+        # Named cursor of namedtuples (record.id, record.url, ...), FETCHed
+        # itersize rows at a time. The writer thread commits on write_conn, never
+        # on self.conn, so a plain transaction-scoped cursor is enough here.
+        cur = self.conn.cursor(name='backfill_cursor', cursor_factory=NamedTupleCursor)
+        cur.itersize = STREAM_CHUNK_SIZE
 
         try:
             if self.coverage_ids:
@@ -99,16 +479,20 @@ class SocialSharesBackfiller:
                         cl.client_id,
                         cl.title,
                         cl.url,
-                        cl.created_at,
-                        ss.coverage_id as has_social_data
+                        cl.created_at
                     FROM agentcy_client_coverage_log cl
-                    LEFT JOIN agentcy_client_coverage_social_shares ss ON cl.id = ss.coverage_id
                     WHERE cl.id IN ({placeholders})
                     AND cl.url IS NOT NULL
                     AND cl.deleted = false
-                    ORDER BY cl.id
                 """
-                cur.execute(query, self.coverage_ids)
+                params = list(self.coverage_ids)
+
+                if self.shard:
+                    query += " AND mod(cl.id, %s) = %s"
+                    params.extend([self.shard[1], self.shard[0]])
+
+                query += " ORDER BY cl.id"
+                cur.execute(query, params)
             else:
                 # Query for records without social shares data
                 query = """
@@ -118,11 +502,13 @@ class SocialSharesBackfiller:
                         cl.client_id,
                         cl.title,
                         cl.url,
-                        cl.created_at,
-                        NULL as has_social_data
+                        cl.created_at
                     FROM agentcy_client_coverage_log cl
-                    LEFT JOIN agentcy_client_coverage_social_shares ss ON cl.id = ss.coverage_id
-                    WHERE ss.coverage_id IS NULL
+                    WHERE NOT EXISTS (
+                        SELECT 1
+                        FROM agentcy_client_coverage_social_shares ss
+                        WHERE ss.coverage_id = cl.id
+                    )
                     AND cl.url IS NOT NULL
                     AND cl.deleted = false
                 """
@@ -133,309 +519,185 @@ class SocialSharesBackfiller:
                     query += " AND cl.client_id = %s"
                     params.append(self.client_id)
 
+                if self.shard:
+                    query += " AND mod(cl.id, %s) = %s"
+                    params.extend([self.shard[1], self.shard[0]])
+
                 query += " ORDER BY cl.created_at DESC LIMIT %s"
                 params.append(self.limit)
 
                 cur.execute(query, params)
 
-            records = []
-            for row in cur.fetchall():
-                records.append({
-                    'id': row[0],
-                    'client': row[1],
-                    'client_id': row[2],
-                    'title': row[3],
-                    'url': row[4],
-                    'created_at': row[5],
-                    'has_social_data': row[6] is not None
-                })
+            # Only --ids runs report missing records, and their ID list is
+            # already in memory; other runs keep nothing per streamed row
+            found_ids = set()
+            for record in cur:
+                if self.coverage_ids:
+                    found_ids.add(record.id)
+                yield record
 
             # If specific IDs were requested, check which ones weren't found
             if self.coverage_ids:
-                found_ids = [r['id'] for r in records]
-                missing_ids = [cid for cid in self.coverage_ids if cid not in found_ids]
+                missing_ids = [
+                    cid for cid in self.coverage_ids
+                    if cid not in found_ids and (not self.shard or cid % self.shard[1] == self.shard[0])
+                ]
                 if missing_ids:
-                    print(f"⚠️  Coverage IDs not found or missing URL: {', '.join(map(str, missing_ids))}")
-
-            return records
+                    logger.warning("⚠️  Coverage IDs not found or missing URL: %s", ', '.join(map(str, missing_ids)))
 
         except Exception as e:
-            print(f"❌ Database query error: {e}")
-            return []
+            logger.error("❌ Database query error: %s", e)
         finally:
             cur.close()
-            conn.close()
+            # Release the snapshot held since the query started
+            self.conn.rollback()
 
-    def process_record(self, record):
-        """Process a single coverage record"""
+    def process_record(self, record, sharedcount_result, x_data):
+        """Process a single coverage record with its fetched metrics"""
         self.processed += 1
 
         total = len(self.coverage_ids) if self.coverage_ids else self.limit
-        print(f"\n🔄 Processing {self.processed}/{total}")
-        print(f"   ID: {record['id']}")
-        print(f"   Client: {record['client']} (ID: {record['client_id']})")
-        print(f"   Title: {record['title'][:80]}...")
-        print(f"   URL: {record['url']}")
-        print(f"   Created: {record['created_at']}")
-
-        if record['has_social_data']:
-            print(f"   ⚠️  Already has social data - updating")
+        logger.debug("🔄 Processing %d/%d", self.processed, total)
+        logger.debug("   ID: %s", record.id)
+        logger.debug("   Client: %s (ID: %s)", record.client, record.client_id)
+        logger.debug("   Title: %.80s...", record.title)
+        logger.debug("   URL: %s", record.url)
+        logger.debug("   Created: %s", record.created_at)
 
         try:
-            # Get Facebook, Reddit, Pinterest data
-            facebook_data, reddit_count, pinterest_count = self.get_sharedcount_data(record['url'])
-
-            # Get X (Twitter) data
-            x_data = self.get_x_data(record['url'])
-
-            # Calculate total engagement
-            total_engagement = (
-                    x_data['tweets'] +
-                    x_data['bookmarks'] +
-                    x_data['favorites'] +
-                    x_data['quotes'] +
-                    x_data['replies'] +
-                    x_data['retweets'] +
-                    reddit_count +
-                    facebook_data['share_count'] +
-                    facebook_data['comment_count'] +
-                    facebook_data['reaction_count'] +
-                    pinterest_count
-            )
-
-            # Save to database
-            if self.save_social_data(
-                    record['id'],
+            facebook_data, reddit_count, pinterest_count = sharedcount_result
+
+            logger.debug("   📱 SharedCount - Reddit: %s, Pinterest: %s", reddit_count, pinterest_count)
+            logger.debug("      Facebook - Shares: %s, Comments: %s, Reactions: %s",
+                         facebook_data['share_count'], facebook_data['comment_count'],
+                         facebook_data['reaction_count'])
+            logger.debug("   🐦 X - Tweets: %s, Bookmarks: %s, Favorites: %s",
+                         x_data['tweets'], x_data['bookmarks'], x_data['favorites'])
+            logger.debug("      Quotes: %s, Replies: %s, Retweets: %s",
+                         x_data['quotes'], x_data['replies'], x_data['retweets'])
+
+            # Queue for the next batched write
+            self.save_social_data(
+                    record.id,
                     x_data,
                     facebook_data,
                     reddit_count,
-                    pinterest_count,
-                    total_engagement,
-                    record['has_social_data']
-            ):
-                print(f"   ✅ Social data saved successfully")
-                print(f"   📊 Total engagement: {total_engagement:,}")
-                self.succeeded += 1
-            else:
-                print(f"   ❌ Failed to save social data")
-                self.failed += 1
+                    pinterest_count
+            )
 
         except Exception as e:
-            print(f"   ❌ ERROR: {str(e)}")
+            logger.error("❌ ERROR processing ID %s: %s", record.id, e)
             self.failed += 1
 
     def get_sharedcount_data(self, url):
-        """Get social share data from SharedCount API"""
-        print(f"   📱 Fetching SharedCount data...")
-
-        try:
-            response = requests.get(
-                'https://api.sharedcount.com/v1.0/',
-                params={'url': url, 'apikey': self.sharedcount_api_key},
-                timeout=30
-            )
+        """Get social share data from SharedCount API, raising if the request fails"""
+        if self.cache:
+            cached = self.cache.get('sharedcount', url)
+            if cached is not None:
+                return tuple(cached)
 
-            if response.status_code != 200:
-                print(f"   ⚠️  SharedCount API returned status {response.status_code}")
-                raise Exception(f"SharedCount API error: {response.status_code}")
+        facebook_data, reddit_count, pinterest_count = fetch_sharedcount(
+            self.sc_session, url, self.sharedcount_api_key, self.sc_bucket
+        )
 
-            data = response.json()
+        if self.cache:
+            self.cache.set('sharedcount', url, [facebook_data, reddit_count, pinterest_count])
 
-            # Extract metrics with defaults
-            reddit_count = data.get('Reddit', 0) or 0
-            facebook_data = {
-                'share_count': data.get('Facebook', {}).get('share_count', 0) or 0,
-                'comment_count': data.get('Facebook', {}).get('comment_count', 0) or 0,
-                'reaction_count': data.get('Facebook', {}).get('reaction_count', 0) or 0
-            }
-            pinterest_count = data.get('Pinterest', 0) or 0
+        return facebook_data, reddit_count, pinterest_count
 
-            print(f"   ✅ SharedCount data received")
-            print(f"      Reddit: {reddit_count}, Pinterest: {pinterest_count}")
-            print(f"      Facebook - Shares: {facebook_data['share_count']}, "
-                  f"Comments: {facebook_data['comment_count']}, "
-                  f"Reactions: {facebook_data['reaction_count']}")
+    def get_x_data(self, url):
+        """Get X (Twitter) engagement data, raising if the request fails"""
+        if self.cache:
+            cached = self.cache.get('x', url)
+            if cached is not None:
+                return cached
 
-            return facebook_data, reddit_count, pinterest_count
+        x_data = fetch_x(self.x_session, url, self.twitter_api_key, self.x_bucket)
 
-        except Exception as e:
-            print(f"   ⚠️  SharedCount API error: {e}")
-            # Return zeros on error
-            return {'share_count': 0, 'comment_count': 0, 'reaction_count': 0}, 0, 0
+        if self.cache:
+            self.cache.set('x', url, x_data)
 
-    def get_x_data(self, url):
-        """Get X (Twitter) engagement data"""
-        print(f"   🐦 Fetching X (Twitter) data...")
+        return x_data
 
-        try:
-            encoded_query = urllib.parse.quote(url)
-
-            conn = http.client.HTTPSConnection("twitter-api45.p.rapidapi.com")
-            headers = {
-                'x-rapidapi-key': self.twitter_api_key,
-                'x-rapidapi-host': "twitter-api45.p.rapidapi.com"
-            }
-
-            conn.request("GET", f"/search.php?query={encoded_query}", headers=headers)
-
-            res = conn.getresponse()
-            data = res.read()
-            response_json = json.loads(data.decode("utf-8"))
-
-            # Initialize counters
-            x_data = {
-                'tweets': 0,
-                'bookmarks': 0,
-                'favorites': 0,
-                'quotes': 0,
-                'replies': 0,
-                'retweets': 0
-            }
-
-            # Loop through tweets
-            for tweet in response_json.get("timeline", []):
-                if tweet.get("type") != "tweet":
-                    continue
-
-                x_data['tweets'] += 1
-                x_data['bookmarks'] += tweet.get("bookmarks", 0)
-                x_data['favorites'] += tweet.get("favorites", 0)
-                x_data['quotes'] += tweet.get("quotes", 0)
-                x_data['replies'] += tweet.get("replies", 0)
-                x_data['retweets'] += tweet.get("retweets", 0)
-
-            print(f"   ✅ X data received")
-            print(f"      Tweets: {x_data['tweets']}, Bookmarks: {x_data['bookmarks']}, "
-                  f"Favorites: {x_data['favorites']}")
-            print(f"      Quotes: {x_data['quotes']}, Replies: {x_data['replies']}, "
-                  f"Retweets: {x_data['retweets']}")
-
-            return x_data
+    def save_social_data(self, coverage_id, x_data, facebook_data, reddit_count,
+                         pinterest_count):
+        """Queue social data for the next batched upsert"""
+        self._pending.append((
+            coverage_id,
+            x_data['tweets'],
+            x_data['bookmarks'],
+            x_data['favorites'],
+            x_data['quotes'],
+            x_data['replies'],
+            x_data['retweets'],
+            reddit_count,
+            facebook_data['share_count'],
+            facebook_data['comment_count'],
+            facebook_data['reaction_count'],
+            pinterest_count
+        ))
+
+    def _flush_batch(self):
+        """Write all pending rows in one transaction"""
+        if not self._pending:
+            return
 
-        except Exception as e:
-            print(f"   ⚠️  X (Twitter) API error: {e}")
-            # Return zeros on error
-            return {
-                'tweets': 0,
-                'bookmarks': 0,
-                'favorites': 0,
-                'quotes': 0,
-                'replies': 0,
-                'retweets': 0
-            }
+        batch = self._pending
+        self._pending = []
 
-    def save_social_data(self, coverage_id, x_data, facebook_data, reddit_count,
-                         pinterest_count, total_engagement, update_existing=False):
-        """Save social data to database"""
-        print(f"   💾 Saving social data to database...")
+        logger.info("💾 Saving %d records to database...", len(batch))
 
-        conn = connect_db()
-        cur = conn.cursor()
+        cur = self.write_conn.cursor()
 
         try:
-            if update_existing:
-                # Update existing record
-                cur.execute("""
-                    UPDATE agentcy_client_coverage_social_shares
-                    SET 
-                        x_tweet_count = %s,
-                        x_bookmark_count = %s,
-                        x_favorite_count = %s,
-                        x_quote_count = %s,
-                        x_reply_count = %s,
-                        x_retweet_count = %s,
-                        reddit_count = %s,
-                        facebook_share_count = %s,
-                        facebook_comment_count = %s,
-                        facebook_reaction_count = %s,
-                        pinterest_count = %s,
-                        total_social_engagement_count = %s,
-                        updated_at = NOW()
-                    WHERE coverage_id = %s
-                """, (
-                    x_data['tweets'],
-                    x_data['bookmarks'],
-                    x_data['favorites'],
-                    x_data['quotes'],
-                    x_data['replies'],
-                    x_data['retweets'],
-                    reddit_count,
-                    facebook_data['share_count'],
-                    facebook_data['comment_count'],
-                    facebook_data['reaction_count'],
-                    pinterest_count,
-                    total_engagement,
-                    coverage_id
-                ))
+            if self.coverage_ids:
+                # --ids re-fetches records that usually exist already; plain upsert
+                execute_values(cur, UPSERT_SQL, batch, page_size=BATCH_SIZE)
             else:
-                # Insert new record
-                cur.execute("""
-                    INSERT INTO agentcy_client_coverage_social_shares (
-                        coverage_id,
-                        x_tweet_count,
-                        x_bookmark_count,
-                        x_favorite_count,
-                        x_quote_count,
-                        x_reply_count,
-                        x_retweet_count,
-                        reddit_count,
-                        facebook_share_count,
-                        facebook_comment_count,
-                        facebook_reaction_count,
-                        pinterest_count,
-                        total_social_engagement_count
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    coverage_id,
-                    x_data['tweets'],
-                    x_data['bookmarks'],
-                    x_data['favorites'],
-                    x_data['quotes'],
-                    x_data['replies'],
-                    x_data['retweets'],
-                    reddit_count,
-                    facebook_data['share_count'],
-                    facebook_data['comment_count'],
-                    facebook_data['reaction_count'],
-                    pinterest_count,
-                    total_engagement
-                ))
-
-            conn.commit()
-            return True
+                self._copy_upsert(cur, batch)
+            self.write_conn.commit()
+            logger.info("✅ Social data saved successfully")
+            self.succeeded += len(batch)
 
         except Exception as e:
-            print(f"   ❌ Database error: {e}")
-            conn.rollback()
-            return False
+            logger.error("❌ Database error: %s", e)
+            self.write_conn.rollback()
+            self.failed += len(batch)
         finally:
             cur.close()
-            conn.close()
+
+    def _copy_upsert(self, cur, batch):
+        """Bulk load a batch with COPY into a temp table, then upsert from it"""
+        buf = io.StringIO()
+        csv.writer(buf).writerows(batch)
+        buf.seek(0)
+
+        cur.execute(COPY_TEMP_TABLE_SQL)
+        cur.copy_expert(COPY_SQL, buf)
+        cur.execute(COPY_UPSERT_SQL)
+
+    def stats(self):
+        """Counters for this run, summed across workers in sharded runs"""
+        return {
+            'processed': self.processed,
+            'succeeded': self.succeeded,
+            'skipped': self.skipped,
+            'deferred': self.deferred,
+            'failed': self.failed,
+            'cache_hits': self.cache.hits if self.cache else 0,
+            'cache_misses': self.cache.misses if self.cache else 0,
+        }
 
     def show_summary(self):
         """Display final summary"""
-        print(f"\n{'=' * 60}")
-        print(f"📊 Backfill Complete!")
-        print(f"{'=' * 60}")
-        print(f"   Total processed: {self.processed}")
-        print(f"   ✅ Succeeded: {self.succeeded}")
-        print(f"   ⚠️  Skipped: {self.skipped}")
-        print(f"   ❌ Failed: {self.failed}")
-
-        # Show success rate
-        if self.processed > 0:
-            success_rate = (self.succeeded / self.processed) * 100
-            print(f"\n   Success rate: {success_rate:.1f}%")
-
-        print(f"{'=' * 60}\n")
+        log_summary(self.stats(), cache_enabled=bool(self.cache))
 
     def show_top_engagement(self, limit=10):
         """Show top coverage by social engagement"""
-        print(f"\n🏆 Top {limit} Coverage by Social Engagement")
-        print("=" * 80)
+        logger.info("\n🏆 Top %d Coverage by Social Engagement", limit)
+        logger.info("=" * 80)
 
-        conn = connect_db()
-        cur = conn.cursor()
+        cur = self.conn.cursor()
 
         try:
             cur.execute("""
@@ -455,22 +717,83 @@ class SocialSharesBackfiller:
 
             results = cur.fetchall()
 
-            print(f"{'ID':>6} {'Client':<20} {'Title':<40} {'Total':>8} {'Tweets':>7} {'FB':>5} {'Reddit':>7}")
-            print("-" * 80)
+            logger.info("%6s %-20s %-40s %8s %7s %5s %7s",
+                        'ID', 'Client', 'Title', 'Total', 'Tweets', 'FB', 'Reddit')
+            logger.info("-" * 80)
 
             for row in results:
                 cov_id, client, title, total, tweets, fb, reddit = row
                 title_short = title[:37] + '...' if len(title) > 40 else title
                 client_short = client[:17] + '...' if len(client) > 20 else client
 
-                print(f"{cov_id:>6} {client_short:<20} {title_short:<40} "
-                      f"{total:>8,} {tweets:>7} {fb:>5} {reddit:>7}")
+                logger.info("%6s %-20s %-40s %8s %7s %5s %7s",
+                            cov_id, client_short, title_short, total, tweets, fb, reddit)
 
         except Exception as e:
-            print(f"❌ Error fetching top engagement: {e}")
+            logger.error("❌ Error fetching top engagement: %s", e)
+            self.conn.rollback()
         finally:
             cur.close()
-            conn.close()
+
+
+def log_summary(stats, cache_enabled=True):
+    """Display final summary"""
+    logger.info("\n%s", "=" * 60)
+    logger.info("📊 Backfill Complete!")
+    logger.info("=" * 60)
+    logger.info("   Total processed: %d", stats['processed'])
+    logger.info("   ✅ Succeeded: %d", stats['succeeded'])
+    logger.info("   ⚠️  Skipped: %d", stats['skipped'])
+    logger.info("   ⏭️  Deferred: %d", stats['deferred'])
+    logger.info("   ❌ Failed: %d", stats['failed'])
+
+    # Show success rate
+    if stats['processed'] > 0:
+        success_rate = (stats['succeeded'] / stats['processed']) * 100
+        logger.info("\n   Success rate: %.1f%%", success_rate)
+
+    if cache_enabled:
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        hit_rate = (stats['cache_hits'] / lookups) * 100 if lookups else 0.0
+        logger.info("   Cache hit rate: %.1f%% (%d hits, %d misses)",
+                    hit_rate, stats['cache_hits'], stats['cache_misses'])
+
+    logger.info("%s\n", "=" * 60)
+
+
+def run_shard(shard, verbose, options):
+    """Worker process: backfill one id % N shard and return its counters"""
+    log_listener = setup_logging(verbose=verbose, prefix=f"[{shard[0] + 1}/{shard[1]}] ")
+
+    try:
+        with SocialSharesBackfiller(shard=shard, **options) as backfiller:
+            backfiller.run(summary=False)
+            return backfiller.stats()
+    finally:
+        log_listener.stop()
+
+
+def run_sharded(workers, verbose, options):
+    """Run one backfiller process per shard and log the combined summary"""
+    if not options.get('coverage_ids'):
+        # Split the record limit evenly between shards
+        options = dict(options, limit=math.ceil(options['limit'] / workers))
+
+    logger.info("🧩 Running %d workers, sharded by coverage ID", workers)
+    if not REDIS_URL:
+        logger.info("   REDIS_URL not set; each worker gets 1/%d of the API budget", workers)
+
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.starmap(
+            run_shard,
+            [((index, workers), verbose, options) for index in range(workers)]
+        )
+
+    totals = Counter()
+    for stats in results:
+        totals.update(stats)
+
+    log_summary(totals, cache_enabled=options['use_cache'])
 
 
 def main():
@@ -490,6 +813,9 @@ Examples:
 
   # Show top engagement after processing
   python backfill_social_shares.py --ids 12345 --show-top
+
+  # Process 10000 records across 4 processes
+  python backfill_social_shares.py --limit 10000 --workers 4
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
@@ -516,38 +842,78 @@ Examples:
         action="store_true",
         help="Show top engagement coverage after processing"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the APIs instead of reusing responses cached in the last 24 hours"
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=1,
+        help="Number of worker processes, each handling the records where id %% N matches its index (default: 1)"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log per-record details (API metrics, totals)"
+    )
 
     args = parser.parse_args()
 
+    log_listener = setup_logging(verbose=args.verbose)
+
     # Validate arguments
     if args.ids and args.client:
-        print("⚠️  WARNING: --client filter is ignored when using --ids")
+        logger.warning("⚠️  WARNING: --client filter is ignored when using --ids")
 
     if args.ids and args.limit != 10:
-        print("⚠️  WARNING: --limit is ignored when using --ids")
+        logger.warning("⚠️  WARNING: --limit is ignored when using --ids")
+
+    options = {
+        'limit': args.limit,
+        'client_id': args.client if not args.ids else None,
+        'coverage_ids': args.ids,
+        'use_cache': not args.no_cache
+    }
+
+    if args.workers > 1:
+        try:
+            run_sharded(args.workers, args.verbose, options)
+
+            if args.show_top:
+                with SocialSharesBackfiller(**options) as backfiller:
+                    backfiller.show_top_engagement()
+
+        except KeyboardInterrupt:
+            logger.warning("\n\n⚠️  Interrupted by user")
+            sys.exit(1)
+        except Exception as e:
+            logger.exception("\n❌ Fatal error: %s", e)
+            sys.exit(1)
+        finally:
+            log_listener.stop()
+        return
 
     # Create and run backfiller
-    backfiller = SocialSharesBackfiller(
-        limit=args.limit,
-        client_id=args.client if not args.ids else None,
-        coverage_ids=args.ids
-    )
+    backfiller = SocialSharesBackfiller(**options)
 
     try:
-        backfiller.run()
+        with backfiller:
+            backfiller.run()
 
-        if args.show_top:
-            backfiller.show_top_engagement()
+            if args.show_top:
+                backfiller.show_top_engagement()
 
     except KeyboardInterrupt:
-        print("\n\n⚠️  Interrupted by user")
+        logger.warning("\n\n⚠️  Interrupted by user")
         backfiller.show_summary()
         sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Fatal error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("\n❌ Fatal error: %s", e)
         sys.exit(1)
+    finally:
+        log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -1,25 +1,18 @@
-import requests
+import os
+import sys
 
-API_KEY = 'c6d646fe157ec581c6be340efe64ddc1da90a729'
-url_to_check = 'https://www.zdnet.com/article/generative-ai-is-now-an-must-have-tool-for-technology-professionals'
-
-response = requests.get(
-    'https://api.sharedcount.com/v1.0/',
-    params={'url': url_to_check, 'apikey': API_KEY}
-)
+# The API clients live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from social_fetchers import build_session, fetch_sharedcount
 
-data = response.json()
+API_KEY = os.environ['SHAREDCOUNT_API_KEY']
+url_to_check = 'https://www.zdnet.com/article/generative-ai-is-now-an-must-have-tool-for-technology-professionals'
 
-# Extract metrics with default 0 if missing
-reddit_count = data.get('Reddit') or 0
-facebook_share_count = data.get('Facebook', {}).get('share_count', 0)
-facebook_comment_count = data.get('Facebook', {}).get('comment_count', 0)
-facebook_reaction_count = data.get('Facebook', {}).get('reaction_count', 0)
-pinterest_count = data.get('Pinterest') or 0
+facebook_data, reddit_count, pinterest_count = fetch_sharedcount(build_session(), url_to_check, API_KEY)
 
 # Print results line by line
 print(f"reddit_count: {reddit_count}")
-print(f"facebook_share_count: {facebook_share_count}")
-print(f"facebook_comment_count: {facebook_comment_count}")
-print(f"facebook_reaction_count: {facebook_reaction_count}")
+print(f"facebook_share_count: {facebook_data['share_count']}")
+print(f"facebook_comment_count: {facebook_data['comment_count']}")
+print(f"facebook_reaction_count: {facebook_data['reaction_count']}")
 print(f"pinterest_count: {pinterest_count}")
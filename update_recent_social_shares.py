@@ -7,109 +7,458 @@ This script is designed to run twice daily via cron job to keep social metrics c
 for recent press coverage.
 
 Usage:
-    python update_recent_social_shares.py [--days N] [--dry-run]
+    python update_recent_social_shares.py [--days N] [--min-staleness-hours H] [--workers N] [--no-cache] [--dry-run]
 
 Options:
-    --days N      Look back N days for coverage (default: 10)
-    --dry-run     Show what would be updated without making changes
+    --days N                  Look back N days for coverage (default: 10)
+    --min-staleness-hours H   Skip records refreshed in the last H hours (default: 6, 0 refreshes all)
+    --workers N               Number of concurrent API fetch threads (default: 8)
+    --no-cache                Always call the APIs instead of reusing cached responses
+    --dry-run                 Show what would be updated without making changes
+
+Set LOG_LEVEL=DEBUG in the environment for per-record details (default: INFO).
 """
 
 import argparse
 import sys
 import os
-import time
-import requests
-import http.client
-import urllib.parse
-import json
+import logging
 from datetime import datetime, timedelta
+from itertools import islice
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import psycopg
 from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
+
+from social_fetchers import build_session, TokenBucket, fetch_sharedcount, fetch_x
+from social_shares_schema import schema_problems
+from script_args import positive_int
+
+# Log level from environment; detail lines are DEBUG, so LOG_LEVEL=WARNING keeps cron logs quiet
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_LEVEL_VALID = isinstance(logging.getLevelName(LOG_LEVEL), int)
+
+logging.basicConfig(
+    level=LOG_LEVEL if LOG_LEVEL_VALID else logging.INFO,
+    format="%(asctime)s %(levelname)s %(message)s"
+)
+logger = logging.getLogger("update_recent_social_shares")
+
+if not LOG_LEVEL_VALID:
+    logger.warning("⚠️  Unknown LOG_LEVEL %r, using INFO", os.environ["LOG_LEVEL"])
 
 # Database connection from environment
 DATABASE_URL = os.environ.get("DATABASE_URL")
 if not DATABASE_URL:
-    print("❌ DATABASE_URL environment variable not set")
+    logger.error("❌ DATABASE_URL environment variable not set")
     sys.exit(1)
 
+# Default number of fetch threads, i.e. API requests in flight at once
+DEFAULT_WORKERS = 8
+
+# Per-API request budgets as (requests per second, burst); the quotas are
+# independent, so a slow or throttled API doesn't hold back the other
+SHAREDCOUNT_RATE_LIMIT = (10, 10)
+TWITTER_RATE_LIMIT = (5, 5)
+
+# Records refreshed more recently than this are skipped (0 refreshes everything)
+DEFAULT_MIN_STALENESS_HOURS = 6
+
+# Engagement settles as coverage ages, so older coverage is refreshed less often:
+# (published within N days, multiple of the min staleness), checked in order.
+# With the 6-hour default: 6h on day 0, 24h up to day 3, 72h after that.
+STALENESS_TIERS = ((1, 1), (3, 4))
+OLD_COVERAGE_STALENESS_MULTIPLIER = 12
+
+# API responses cached in social_fetch_cache are reused for this long
+FETCH_CACHE_TTL_HOURS = 6
+
+# Results kept in memory for the most recently seen URLs, so syndicated
+# coverage further down the stream isn't fetched again even with --no-cache
+RECENT_RESULTS_SIZE = 4096
+
+# Rows pulled from the server-side coverage cursor per round trip
+STREAM_CHUNK_SIZE = 500
+
+# The trending report ranks coverage by engagement gained over this window
+TRENDING_WINDOW_HOURS = 24
+
+# Number of processed records written per batch
+BATCH_SIZE = 100
+
+# Insert new rows and overwrite existing ones whose counts changed, in a single
+# statement; unchanged rows are skipped server-side and not returned
+UPSERT_SQL = """
+    INSERT INTO agentcy_client_coverage_social_shares (
+        coverage_id,
+        x_tweet_count,
+        x_bookmark_count,
+        x_favorite_count,
+        x_quote_count,
+        x_reply_count,
+        x_retweet_count,
+        reddit_count,
+        facebook_share_count,
+        facebook_comment_count,
+        facebook_reaction_count,
+        pinterest_count,
+        updated_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+    ON CONFLICT (coverage_id) DO UPDATE SET
+        x_tweet_count = EXCLUDED.x_tweet_count,
+        x_bookmark_count = EXCLUDED.x_bookmark_count,
+        x_favorite_count = EXCLUDED.x_favorite_count,
+        x_quote_count = EXCLUDED.x_quote_count,
+        x_reply_count = EXCLUDED.x_reply_count,
+        x_retweet_count = EXCLUDED.x_retweet_count,
+        reddit_count = EXCLUDED.reddit_count,
+        facebook_share_count = EXCLUDED.facebook_share_count,
+        facebook_comment_count = EXCLUDED.facebook_comment_count,
+        facebook_reaction_count = EXCLUDED.facebook_reaction_count,
+        pinterest_count = EXCLUDED.pinterest_count,
+        updated_at = NOW()
+    WHERE (
+        agentcy_client_coverage_social_shares.x_tweet_count,
+        agentcy_client_coverage_social_shares.x_bookmark_count,
+        agentcy_client_coverage_social_shares.x_favorite_count,
+        agentcy_client_coverage_social_shares.x_quote_count,
+        agentcy_client_coverage_social_shares.x_reply_count,
+        agentcy_client_coverage_social_shares.x_retweet_count,
+        agentcy_client_coverage_social_shares.reddit_count,
+        agentcy_client_coverage_social_shares.facebook_share_count,
+        agentcy_client_coverage_social_shares.facebook_comment_count,
+        agentcy_client_coverage_social_shares.facebook_reaction_count,
+        agentcy_client_coverage_social_shares.pinterest_count
+    ) IS DISTINCT FROM (
+        EXCLUDED.x_tweet_count,
+        EXCLUDED.x_bookmark_count,
+        EXCLUDED.x_favorite_count,
+        EXCLUDED.x_quote_count,
+        EXCLUDED.x_reply_count,
+        EXCLUDED.x_retweet_count,
+        EXCLUDED.reddit_count,
+        EXCLUDED.facebook_share_count,
+        EXCLUDED.facebook_comment_count,
+        EXCLUDED.facebook_reaction_count,
+        EXCLUDED.pinterest_count
+    )
+    RETURNING coverage_id, (xmax = 0) AS inserted
+"""
+
+CACHE_LOOKUP_SQL = """
+    SELECT url, sharedcount_json, x_json
+    FROM social_fetch_cache
+    WHERE url = ANY(%s)
+    AND fetched_at > NOW() - make_interval(hours => %s)
+"""
+
+# Keep the higher count unless the cached row has expired, so a flaky
+# response can't overwrite good data with lower numbers
+CACHE_UPSERT_SQL = """
+    INSERT INTO social_fetch_cache (url, sharedcount_json, x_json, total_engagement, fetched_at)
+    VALUES (%s, %s, %s, %s, NOW())
+    ON CONFLICT (url) DO UPDATE SET
+        sharedcount_json = EXCLUDED.sharedcount_json,
+        x_json = EXCLUDED.x_json,
+        total_engagement = EXCLUDED.total_engagement,
+        fetched_at = EXCLUDED.fetched_at
+    WHERE social_fetch_cache.total_engagement <= EXCLUDED.total_engagement
+    OR social_fetch_cache.fetched_at <= NOW() - make_interval(hours => %s)
+"""
+
+# Unchanged records still get their "last checked" timestamp refreshed, so the
+# staleness filter doesn't pick them up again on the next run
+TOUCH_SQL = """
+    UPDATE agentcy_client_coverage_social_shares
+    SET updated_at = NOW()
+    WHERE coverage_id = ANY(%s)
+"""
+
 
 def connect_db():
     """Connect to database using environment variable"""
     try:
         return psycopg.connect(DATABASE_URL)
     except Exception as e:
-        print(f"❌ Database connection failed: {e}")
+        logger.error("❌ Database connection failed: %s", e)
         sys.exit(1)
 
 
 class RecentSocialSharesUpdater:
-    def __init__(self, days_back=10, dry_run=False):
+    def __init__(self, days_back=10, dry_run=False, min_staleness_hours=DEFAULT_MIN_STALENESS_HOURS,
+                 use_cache=True, workers=DEFAULT_WORKERS):
         self.days_back = days_back
+        self.min_staleness_hours = min_staleness_hours
         self.dry_run = dry_run
+        self.use_cache = use_cache
+        self.workers = workers
         self.processed = 0
         self.updated = 0
         self.new_records = 0
         self.failed = 0
         self.unchanged = 0
+        self.cache_hits = 0
         self.total_records = 0
 
+        # Rows waiting for the next batched write
+        self._pending = []
+
+        # Fresh API results waiting to be written to social_fetch_cache with the next batch
+        self._cache_rows = []
+
+        # URL -> (sharedcount_result, x_data), least recently used first
+        self._recent_results = OrderedDict()
+
+        # Shared by the fetch threads so each API sees a steady request rate
+        self.sc_limiter = TokenBucket(*SHAREDCOUNT_RATE_LIMIT)
+        self.x_limiter = TokenBucket(*TWITTER_RATE_LIMIT)
+
+        # One pooled HTTP session for the run, so connections to both API hosts are reused.
+        # Each host keeps one idle keep-alive connection per worker, so no thread has to
+        # open a fresh TLS connection while the others hold theirs.
+        self.http = build_session(pool_maxsize=self.workers)
+
+        # Coverage is streamed on its own connection, inside one open transaction,
+        # so the batch commits and cache lookups on self.conn never touch the cursor
+        self.conn = connect_db()
+        self.read_conn = connect_db()
+
         # API Keys from environment
         self.sharedcount_api_key = os.environ.get("SHAREDCOUNT_API_KEY")
         self.twitter_api_key = os.environ.get("TWITTER_API_KEY")
 
         if not self.sharedcount_api_key:
-            print("⚠️  WARNING: SHAREDCOUNT_API_KEY not set in environment")
+            logger.warning("⚠️  SHAREDCOUNT_API_KEY not set in environment")
         if not self.twitter_api_key:
-            print("⚠️  WARNING: TWITTER_API_KEY not set in environment")
+            logger.warning("⚠️  TWITTER_API_KEY not set in environment")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def close(self):
+        """Release the database connections and HTTP session"""
+        self.conn.close()
+        self.read_conn.close()
+        self.http.close()
 
     def run(self):
         """Main execution method"""
         start_time = datetime.now()
 
-        print(f"🚀 Starting Recent Social Shares Update")
-        print(f"{'=' * 60}")
-        print(f"Time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Mode: {'DRY RUN' if self.dry_run else 'LIVE'}")
-        print(f"Days back: {self.days_back}")
-        print(f"SharedCount API: {'✅ Configured' if self.sharedcount_api_key else '❌ Missing'}")
-        print(f"Twitter API: {'✅ Configured' if self.twitter_api_key else '❌ Missing'}")
-        print(f"{'=' * 60}\n")
+        logger.info("🚀 Starting Recent Social Shares Update")
+        logger.info("=" * 60)
+        logger.info("Mode: %s", 'DRY RUN' if self.dry_run else 'LIVE')
+        logger.info("Days back: %s", self.days_back)
+        logger.info("Min staleness: %s hours", self.min_staleness_hours)
+        logger.info("Workers: %d", self.workers)
+        logger.info("Response cache: %s", f"{FETCH_CACHE_TTL_HOURS} hours" if self.use_cache else 'Disabled')
+        logger.info("SharedCount API: %s", '✅ Configured' if self.sharedcount_api_key else '❌ Missing')
+        logger.info("Twitter API: %s", '✅ Configured' if self.twitter_api_key else '❌ Missing')
+        logger.info("=" * 60)
+
+        if not self.dry_run:
+            self.check_api_keys()
+            self.check_schema()
+
+        # Count first so progress can be shown while records are streamed
+        self.total_records = self.count_recent_coverage()
+
+        if not self.total_records:
+            logger.info("✅ No recent coverage found to update")
+            return
 
-        # Get records to process
-        records = self.get_recent_coverage()
+        logger.info("📋 Found %d coverage items from the past %d days", self.total_records, self.days_back)
 
-        if not records:
-            print("✅ No recent coverage found to update")
-            return
+        # A generator over a server-side cursor: the first chunk reaches the fetch
+        # threads while the server is still producing the rest
+        records = self.get_recent_coverage()
 
-        print(f"📋 Found {len(records)} coverage items from the past {self.days_back} days\n")
+        if self.dry_run:
+            for record in records:
+                self.process_record(record)
+        else:
+            try:
+                # Only the fetches run on the pool; counters and database writes
+                # stay on this thread, so neither needs a lock or a connection pool
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    try:
+                        for chunk in iter(lambda: list(islice(records, STREAM_CHUNK_SIZE)), []):
+                            self.process_chunk(executor, chunk)
+                    except KeyboardInterrupt:
+                        # Cancel this chunk's fetches that haven't started, so the
+                        # flush below runs now rather than after them
+                        executor.shutdown(cancel_futures=True)
+                        raise
+            finally:
+                # Write whatever is left over, including after an interrupt
+                self.flush()
 
-        # Store total for use in process_record
-        self.total_records = len(records)
+        # Show summary
+        self.show_summary(start_time)
 
-        # Process each record
+    def process_chunk(self, executor, records):
+        """Fetch and process one chunk of streamed coverage records"""
+        # URLs already seen in this run reuse their results
+        remaining = []
         for record in records:
-            self.process_record(record)
+            if record['url'] in self._recent_results:
+                self._recent_results.move_to_end(record['url'])
+                self.process_record(record, *self._recent_results[record['url']])
+            else:
+                remaining.append(record)
+
+        # URLs fetched recently by earlier runs skip the APIs too
+        cached = self.get_cached_results(remaining) if remaining else {}
+
+        # Records still to fetch, grouped so each URL is fetched once
+        by_url = defaultdict(list)
+        for record in remaining:
+            if record['url'] in cached:
+                self.cache_hits += 1
+                self.remember_result(record['url'], *cached[record['url']])
+                self.process_record(record, *cached[record['url']])
+                continue
+
+            by_url[record['url']].append(record)
+
+        # API calls run on the thread pool, with each URL's SharedCount and X
+        # requests in flight together; results are processed here as they
+        # arrive, so output and database writes stay on one thread
+        url_futures = {}
+        futures = {}
+        for url in by_url:
+            url_futures[url] = (
+                executor.submit(self.get_sharedcount_data, url),
+                executor.submit(self.get_x_data, url)
+            )
+            for future in url_futures[url]:
+                futures[future] = url
+
+        # Number of API results received so far for each URL
+        received = defaultdict(int)
+
+        for future in as_completed(futures):
+            url = futures[future]
+            received[url] += 1
+            if received[url] < 2:
+                continue
+
+            sharedcount_future, x_future = url_futures.pop(url)
+            if not self.fetch_succeeded(sharedcount_future, x_future, url):
+                # Writing zeros would wipe the stored counts and record a false drop
+                # in the engagement history; leave the records for the next run
+                self.processed += len(by_url[url])
+                self.failed += len(by_url[url])
+                continue
+
+            sharedcount_result = sharedcount_future.result()
+            x_data = x_future.result()
+
+            if self.use_cache:
+                self.cache_result(url, sharedcount_result, x_data)
+            self.remember_result(url, sharedcount_result, x_data)
+
+            for record in by_url[url]:
+                self.process_record(record, sharedcount_result, x_data)
+
+            if len(self._pending) >= BATCH_SIZE:
+                self.flush()
+
+    def remember_result(self, url, sharedcount_result, x_data):
+        """Keep url's results for later chunks, evicting the least recently used URL"""
+        self._recent_results[url] = (sharedcount_result, x_data)
+        self._recent_results.move_to_end(url)
+        if len(self._recent_results) > RECENT_RESULTS_SIZE:
+            self._recent_results.popitem(last=False)
+
+    def check_api_keys(self):
+        """Exit before a live run if either API key is missing"""
+        # Without a key there are no real counts to write, and upserting zeros
+        # would wipe the stored ones and record a false drop in the history
+        if not (self.sharedcount_api_key and self.twitter_api_key):
+            logger.error("❌ SHAREDCOUNT_API_KEY and TWITTER_API_KEY must both be set for a live run")
+            sys.exit(1)
+
+    def check_schema(self):
+        """Exit before fetching anything if a migration the writes rely on is missing"""
+        problems = schema_problems(self.conn)
+        self.conn.commit()
+
+        for problem in problems:
+            logger.error("❌ %s", problem)
+        if problems:
+            sys.exit(1)
+
+    def _recent_coverage_filter(self):
+        """FROM/WHERE clause and parameters shared by the coverage count and query"""
+        # Calculate cutoff date
+        cutoff_date = datetime.now() - timedelta(days=self.days_back)
+        params = [cutoff_date]
+
+        sql = """
+            FROM agentcy_client_coverage_log cl
+            LEFT JOIN agentcy_client_coverage_social_shares ss ON cl.id = ss.coverage_id
+            WHERE cl.published >= %s
+            AND cl.url IS NOT NULL
+            AND cl.deleted = false
+        """
+
+        if self.min_staleness_hours > 0:
+            # Skip records refreshed recently for their age; their counts have barely moved.
+            # The cutoffs use the server's NOW(), the clock updated_at is written with.
+            tiers = []
+            for days, multiplier in STALENESS_TIERS:
+                tiers.append("WHEN cl.published > NOW() - make_interval(days => %s) "
+                             "THEN make_interval(secs => %s)")
+                params += [days, self.min_staleness_hours * multiplier * 3600]
+            params.append(self.min_staleness_hours * OLD_COVERAGE_STALENESS_MULTIPLIER * 3600)
+
+            sql += f"""
+            AND (
+                ss.updated_at IS NULL
+                OR ss.updated_at < NOW() - CASE {' '.join(tiers)} ELSE make_interval(secs => %s) END
+            )
+            """
 
-            # Rate limiting between requests
-            if self.processed < len(records):
-                time.sleep(1)  # 1 second between requests
+        return sql, params
 
-        # Show summary
-        self.show_summary(start_time)
+    def count_recent_coverage(self):
+        """Count coverage records published in the past N days that are due for an update"""
+        logger.info("🔍 Querying for coverage published in the past %d days...", self.days_back)
 
-    def get_recent_coverage(self):
-        """Get coverage records published in the past N days"""
-        print(f"🔍 Querying for coverage published in the past {self.days_back} days...")
+        cur = self.conn.cursor()
+
+        try:
+            sql, params = self._recent_coverage_filter()
+            cur.execute(f"SELECT COUNT(*) {sql}", params)
+            count = cur.fetchone()[0]
+            self.conn.commit()
+            return count
+
+        except Exception as e:
+            logger.error("❌ Database query error: %s", e)
+            self.conn.rollback()
+            return 0
+        finally:
+            cur.close()
 
-        conn = connect_db()
-        cur = conn.cursor(row_factory=dict_row)
+    def get_recent_coverage(self):
+        """Yield coverage records published in the past N days"""
+        # Named cursor on read_conn, fetched STREAM_CHUNK_SIZE dict rows at a time.
+        # Batch commits happen on self.conn, so it never has to outlive a commit
+        # as WITH HOLD, which would have the server materialize every row first.
+        cur = self.read_conn.cursor(name='recent_coverage', row_factory=dict_row)
+        cur.itersize = STREAM_CHUNK_SIZE
 
         try:
-            # Calculate cutoff date
-            cutoff_date = datetime.now() - timedelta(days=self.days_back)
+            sql, params = self._recent_coverage_filter()
 
-            query = """
+            # New records first, then the stalest
+            query = f"""
                 SELECT 
                     cl.id,
                     cl.client,
@@ -118,413 +467,278 @@ class RecentSocialSharesUpdater:
                     cl.url,
                     cl.published,
                     cl.created_at,
-                    ss.coverage_id as has_social_data,
-                    ss.x_tweet_count,
-                    ss.x_bookmark_count,
-                    ss.x_favorite_count,
-                    ss.facebook_share_count,
-                    ss.reddit_count,
-                    ss.pinterest_count,
-                    ss.total_social_engagement_count,
-                    ss.updated_at as last_social_update
-                FROM agentcy_client_coverage_log cl
-                LEFT JOIN agentcy_client_coverage_social_shares ss ON cl.id = ss.coverage_id
-                WHERE cl.published >= %s
-                AND cl.url IS NOT NULL
-                AND cl.deleted = false
-                ORDER BY cl.published DESC
+                    (ss.coverage_id IS NOT NULL) AS has_social_data
+                {sql}
+                ORDER BY ss.updated_at ASC NULLS FIRST, cl.published DESC
             """
 
-            cur.execute(query, (cutoff_date,))
-            records = cur.fetchall()
+            cur.execute(query, params)
+
+            yield from cur
+
+        except Exception as e:
+            logger.error("❌ Database query error: %s", e)
+        finally:
+            cur.close()
+            # read_conn never writes; rolling back just closes its transaction
+            self.read_conn.rollback()
+
+    def get_cached_results(self, records):
+        """Map URL -> (sharedcount_result, x_data) for URLs with a fresh social_fetch_cache row"""
+        if not self.use_cache:
+            return {}
+
+        cur = self.conn.cursor()
+
+        try:
+            urls = list({record['url'] for record in records})
+            cur.execute(CACHE_LOOKUP_SQL, (urls, FETCH_CACHE_TTL_HOURS))
+
+            cached = {}
+            for url, sharedcount_json, x_json in cur.fetchall():
+                facebook_data = sharedcount_json['facebook']
+                cached[url] = (
+                    (facebook_data, sharedcount_json['reddit'], sharedcount_json['pinterest']),
+                    x_json
+                )
+
+            self.conn.commit()
+
+            if cached:
+                logger.info("🗄️  %d URLs served from the response cache", len(cached))
 
-            # Convert to list of dicts for easier handling
-            return [dict(row) for row in records]
+            return cached
 
         except Exception as e:
-            print(f"❌ Database query error: {e}")
-            return []
+            logger.warning("⚠️  Response cache lookup failed: %s", e)
+            self.conn.rollback()
+            return {}
         finally:
             cur.close()
-            conn.close()
 
-    def process_record(self, record):
-        """Process a single coverage record"""
+    def cache_result(self, url, sharedcount_result, x_data):
+        """Queue a fresh API result for social_fetch_cache"""
+        facebook_data, reddit_count, pinterest_count = sharedcount_result
+        total_engagement = (
+            sum(facebook_data.values()) + reddit_count + pinterest_count + sum(x_data.values())
+        )
+
+        self._cache_rows.append((
+            url,
+            Jsonb({'facebook': facebook_data, 'reddit': reddit_count, 'pinterest': pinterest_count}),
+            Jsonb(x_data),
+            total_engagement,
+            FETCH_CACHE_TTL_HOURS
+        ))
+
+    def fetch_succeeded(self, sharedcount_future, x_future, url):
+        """Log any API error for url's finished futures; True if both requests succeeded"""
+        succeeded = True
+
+        if sharedcount_future.exception():
+            logger.warning("⚠️  SharedCount API error for %s: %s", url, sharedcount_future.exception())
+            succeeded = False
+
+        if x_future.exception():
+            logger.warning("⚠️  X (Twitter) API error for %s: %s", url, x_future.exception())
+            succeeded = False
+
+        return succeeded
+
+    def process_record(self, record, sharedcount_result=None, x_data=None):
+        """Process a single coverage record with its fetched metrics"""
         self.processed += 1
 
-        print(f"\n🔄 Processing {self.processed}/{self.total_records}")
-        print(f"   ID: {record['id']}")
-        print(f"   Client: {record['client']} (ID: {record['client_id']})")
-        print(f"   Title: {record['title'][:80]}...")
-        print(f"   URL: {record['url']}")
-        print(f"   Published: {record['published']}")
+        logger.info("🔄 Processing %d/%d: ID %s", self.processed, self.total_records, record['id'])
+        logger.debug("   Client: %s (ID: %s)", record['client'], record['client_id'])
+        logger.debug("   Title: %.80s...", record['title'])
+        logger.debug("   URL: %s", record['url'])
+        logger.debug("   Published: %s", record['published'])
 
-        if record['has_social_data']:
-            print(f"   📊 Current engagement: {record['total_social_engagement_count']:,}")
-            print(f"   Last updated: {record['last_social_update']}")
-        else:
-            print(f"   🆕 No social data yet - will create new record")
+        if not record['has_social_data']:
+            logger.debug("   🆕 No social data yet - will create new record")
 
         if self.dry_run:
-            print(f"   🔍 DRY RUN - Would fetch new metrics")
+            logger.debug("   🔍 DRY RUN - Would fetch new metrics")
             return
 
         try:
             # Get current metrics
-            facebook_data, reddit_count, pinterest_count = self.get_sharedcount_data(record['url'])
-            x_data = self.get_x_data(record['url'])
-
-            # Calculate total engagement
-            total_engagement = (
-                    x_data['tweets'] +
-                    x_data['bookmarks'] +
-                    x_data['favorites'] +
-                    x_data['quotes'] +
-                    x_data['replies'] +
-                    x_data['retweets'] +
-                    reddit_count +
-                    facebook_data['share_count'] +
-                    facebook_data['comment_count'] +
-                    facebook_data['reaction_count'] +
-                    pinterest_count
-            )
-
-            # Check if metrics changed
-            if record['has_social_data']:
-                old_total = record['total_social_engagement_count'] or 0
-                if total_engagement != old_total:
-                    print(f"   📈 Engagement changed: {old_total:,} → {total_engagement:,} "
-                          f"({'+' if total_engagement > old_total else ''}{total_engagement - old_total:,})")
-                else:
-                    print(f"   ⏸️  No change in engagement metrics - updating timestamp only")
-                    # Still update the timestamp even if metrics haven't changed
-                    if self.update_timestamp_only(record['id']):
-                        print(f"   ✅ Timestamp updated successfully")
-                        self.unchanged += 1
-                    else:
-                        print(f"   ❌ Failed to update timestamp")
-                        self.failed += 1
-                    return
-
-            # Save to database
-            if self.save_social_data(
+            facebook_data, reddit_count, pinterest_count = sharedcount_result
+
+            logger.debug("   📱 SharedCount - Reddit: %s, Pinterest: %s", reddit_count, pinterest_count)
+            logger.debug("      Facebook - Shares: %s, Comments: %s, Reactions: %s",
+                         facebook_data['share_count'], facebook_data['comment_count'],
+                         facebook_data['reaction_count'])
+            logger.debug("   🐦 X - Tweets: %s, Bookmarks: %s, Favorites: %s",
+                         x_data['tweets'], x_data['bookmarks'], x_data['favorites'])
+            logger.debug("      Quotes: %s, Replies: %s, Retweets: %s",
+                         x_data['quotes'], x_data['replies'], x_data['retweets'])
+
+            # Queue for the next batched write; the upsert itself detects changes
+            self.save_social_data(
                     record['id'],
                     x_data,
                     facebook_data,
                     reddit_count,
-                    pinterest_count,
-                    total_engagement,
-                    record['has_social_data']
-            ):
-                if record['has_social_data']:
-                    print(f"   ✅ Social data updated successfully")
-                    self.updated += 1
-                else:
-                    print(f"   ✅ Social data created successfully")
-                    self.new_records += 1
-                print(f"   📊 Total engagement: {total_engagement:,}")
-            else:
-                print(f"   ❌ Failed to save social data")
-                self.failed += 1
+                    pinterest_count
+            )
 
         except Exception as e:
-            print(f"   ❌ ERROR: {str(e)}")
+            logger.error("❌ ERROR processing ID %s: %s", record['id'], e)
             self.failed += 1
 
     def get_sharedcount_data(self, url):
-        """Get social share data from SharedCount API"""
-        print(f"   📱 Fetching SharedCount data...")
-
-        if not self.sharedcount_api_key:
-            print(f"   ⚠️  SharedCount API key not configured")
-            return {'share_count': 0, 'comment_count': 0, 'reaction_count': 0}, 0, 0
-
-        try:
-            response = requests.get(
-                'https://api.sharedcount.com/v1.0/',
-                params={'url': url, 'apikey': self.sharedcount_api_key},
-                timeout=30
-            )
-
-            if response.status_code != 200:
-                print(f"   ⚠️  SharedCount API returned status {response.status_code}")
-                raise Exception(f"SharedCount API error: {response.status_code}")
-
-            data = response.json()
-
-            # Extract metrics with defaults
-            reddit_count = data.get('Reddit', 0) or 0
-            facebook_data = {
-                'share_count': data.get('Facebook', {}).get('share_count', 0) or 0,
-                'comment_count': data.get('Facebook', {}).get('comment_count', 0) or 0,
-                'reaction_count': data.get('Facebook', {}).get('reaction_count', 0) or 0
-            }
-            pinterest_count = data.get('Pinterest', 0) or 0
-
-            print(f"   ✅ SharedCount data received")
-            print(f"      Reddit: {reddit_count}, Pinterest: {pinterest_count}")
-            print(f"      Facebook - Shares: {facebook_data['share_count']}, "
-                  f"Comments: {facebook_data['comment_count']}, "
-                  f"Reactions: {facebook_data['reaction_count']}")
-
-            return facebook_data, reddit_count, pinterest_count
-
-        except Exception as e:
-            print(f"   ⚠️  SharedCount API error: {e}")
-            return {'share_count': 0, 'comment_count': 0, 'reaction_count': 0}, 0, 0
+        """Get social share data from SharedCount API, raising if the request fails"""
+        return fetch_sharedcount(self.http, url, self.sharedcount_api_key, self.sc_limiter)
 
     def get_x_data(self, url):
-        """Get X (Twitter) engagement data"""
-        print(f"   🐦 Fetching X (Twitter) data...")
-
-        if not self.twitter_api_key:
-            print(f"   ⚠️  Twitter API key not configured")
-            return {
-                'tweets': 0,
-                'bookmarks': 0,
-                'favorites': 0,
-                'quotes': 0,
-                'replies': 0,
-                'retweets': 0
-            }
-
-        try:
-            encoded_query = urllib.parse.quote(url)
-
-            conn = http.client.HTTPSConnection("twitter-api45.p.rapidapi.com")
-            headers = {
-                'x-rapidapi-key': self.twitter_api_key,
-                'x-rapidapi-host': "twitter-api45.p.rapidapi.com"
-            }
-
-            conn.request("GET", f"/search.php?query={encoded_query}", headers=headers)
-
-            res = conn.getresponse()
-            data = res.read()
-            response_json = json.loads(data.decode("utf-8"))
-
-            # Initialize counters
-            x_data = {
-                'tweets': 0,
-                'bookmarks': 0,
-                'favorites': 0,
-                'quotes': 0,
-                'replies': 0,
-                'retweets': 0
-            }
-
-            # Loop through tweets
-            for tweet in response_json.get("timeline", []):
-                if tweet.get("type") != "tweet":
-                    continue
-
-                x_data['tweets'] += 1
-                x_data['bookmarks'] += tweet.get("bookmarks", 0)
-                x_data['favorites'] += tweet.get("favorites", 0)
-                x_data['quotes'] += tweet.get("quotes", 0)
-                x_data['replies'] += tweet.get("replies", 0)
-                x_data['retweets'] += tweet.get("retweets", 0)
-
-            print(f"   ✅ X data received")
-            print(f"      Tweets: {x_data['tweets']}, Bookmarks: {x_data['bookmarks']}, "
-                  f"Favorites: {x_data['favorites']}")
-            print(f"      Quotes: {x_data['quotes']}, Replies: {x_data['replies']}, "
-                  f"Retweets: {x_data['retweets']}")
-
-            return x_data
-
-        except Exception as e:
-            print(f"   ⚠️  X (Twitter) API error: {e}")
-            return {
-                'tweets': 0,
-                'bookmarks': 0,
-                'favorites': 0,
-                'quotes': 0,
-                'replies': 0,
-                'retweets': 0
-            }
-
-    def update_timestamp_only(self, coverage_id):
-        """Update only the timestamp for unchanged records"""
-        conn = connect_db()
-        cur = conn.cursor()
+        """Get X (Twitter) engagement data, raising if the request fails"""
+        return fetch_x(self.http, url, self.twitter_api_key, self.x_limiter)
 
-        try:
-            cur.execute("""
-                UPDATE agentcy_client_coverage_social_shares
-                SET updated_at = NOW()
-                WHERE coverage_id = %s
-            """, (coverage_id,))
-
-            conn.commit()
-            return True
+    def save_social_data(self, coverage_id, x_data, facebook_data, reddit_count,
+                         pinterest_count):
+        """Queue social data for the next batched upsert"""
+        self._pending.append((
+            coverage_id,
+            x_data['tweets'],
+            x_data['bookmarks'],
+            x_data['favorites'],
+            x_data['quotes'],
+            x_data['replies'],
+            x_data['retweets'],
+            reddit_count,
+            facebook_data['share_count'],
+            facebook_data['comment_count'],
+            facebook_data['reaction_count'],
+            pinterest_count
+        ))
+
+    def flush(self):
+        """Write queued rows, timestamp updates and cached responses in one transaction"""
+        if not self._pending and not self._cache_rows:
+            return
 
-        except Exception as e:
-            print(f"   ❌ Database error updating timestamp: {e}")
-            conn.rollback()
-            return False
-        finally:
-            cur.close()
-            conn.close()
+        pending, self._pending = self._pending, []
+        cache_rows, self._cache_rows = self._cache_rows, []
 
-    def save_social_data(self, coverage_id, x_data, facebook_data, reddit_count,
-                         pinterest_count, total_engagement, update_existing=False):
-        """Save social data to database"""
-        print(f"   💾 Saving social data to database...")
+        logger.info("💾 Saving %d records to database...", len(pending))
 
-        conn = connect_db()
-        cur = conn.cursor()
+        cur = self.conn.cursor()
 
         try:
-            if update_existing:
-                # Update existing record
-                cur.execute("""
-                    UPDATE agentcy_client_coverage_social_shares
-                    SET 
-                        x_tweet_count = %s,
-                        x_bookmark_count = %s,
-                        x_favorite_count = %s,
-                        x_quote_count = %s,
-                        x_reply_count = %s,
-                        x_retweet_count = %s,
-                        reddit_count = %s,
-                        facebook_share_count = %s,
-                        facebook_comment_count = %s,
-                        facebook_reaction_count = %s,
-                        pinterest_count = %s,
-                        total_social_engagement_count = %s,
-                        updated_at = NOW()
-                    WHERE coverage_id = %s
-                """, (
-                    x_data['tweets'],
-                    x_data['bookmarks'],
-                    x_data['favorites'],
-                    x_data['quotes'],
-                    x_data['replies'],
-                    x_data['retweets'],
-                    reddit_count,
-                    facebook_data['share_count'],
-                    facebook_data['comment_count'],
-                    facebook_data['reaction_count'],
-                    pinterest_count,
-                    total_engagement,
-                    coverage_id
-                ))
-            else:
-                # Insert new record
-                cur.execute("""
-                    INSERT INTO agentcy_client_coverage_social_shares (
-                        coverage_id,
-                        x_tweet_count,
-                        x_bookmark_count,
-                        x_favorite_count,
-                        x_quote_count,
-                        x_reply_count,
-                        x_retweet_count,
-                        reddit_count,
-                        facebook_share_count,
-                        facebook_comment_count,
-                        facebook_reaction_count,
-                        pinterest_count,
-                        total_social_engagement_count
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    coverage_id,
-                    x_data['tweets'],
-                    x_data['bookmarks'],
-                    x_data['favorites'],
-                    x_data['quotes'],
-                    x_data['replies'],
-                    x_data['retweets'],
-                    reddit_count,
-                    facebook_data['share_count'],
-                    facebook_data['comment_count'],
-                    facebook_data['reaction_count'],
-                    pinterest_count,
-                    total_engagement
-                ))
-
-            conn.commit()
-            return True
+            # Rows the upsert actually inserted or changed, one result set per row;
+            # xmax is 0 only on a freshly inserted row version
+            written = {}
+            if pending:
+                cur.executemany(UPSERT_SQL, pending, returning=True)
+                while True:
+                    written.update(cur.fetchall())
+                    if not cur.nextset():
+                        break
+
+            # Still update the timestamp even if metrics haven't changed
+            unchanged_ids = [row[0] for row in pending if row[0] not in written]
+            if unchanged_ids:
+                cur.execute(TOUCH_SQL, (unchanged_ids,))
+
+            if cache_rows:
+                # The cache is optional: under a savepoint, a failed cache write
+                # (say migration 003 isn't applied) leaves the share writes intact
+                try:
+                    with self.conn.transaction():
+                        cur.executemany(CACHE_UPSERT_SQL, cache_rows)
+                except Exception as e:
+                    logger.warning("⚠️  Response cache write failed: %s", e)
+
+            self.conn.commit()
+            logger.info("✅ Social data saved successfully")
+
+            inserted = sum(written.values())
+            self.new_records += inserted
+            self.updated += len(written) - inserted
+            self.unchanged += len(unchanged_ids)
 
         except Exception as e:
-            print(f"   ❌ Database error: {e}")
-            conn.rollback()
-            return False
+            logger.error("❌ Database error: %s", e)
+            self.conn.rollback()
+            self.failed += len(pending)
         finally:
             cur.close()
-            conn.close()
 
     def show_summary(self, start_time):
         """Display final summary"""
         end_time = datetime.now()
         duration = end_time - start_time
 
-        print(f"\n{'=' * 60}")
-        print(f"📊 Update Complete!")
-        print(f"{'=' * 60}")
-        print(f"   Started: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"   Finished: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"   Duration: {duration}")
-        print(f"\n   Total processed: {self.processed}")
-        print(f"   ✅ Updated: {self.updated}")
-        print(f"   🆕 New records: {self.new_records}")
-        print(f"   ⏸️  Unchanged: {self.unchanged}")
-        print(f"   ❌ Failed: {self.failed}")
+        logger.info("=" * 60)
+        logger.info("📊 Update Complete!")
+        logger.info("=" * 60)
+        logger.info("   Started: %s", start_time.strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("   Finished: %s", end_time.strftime('%Y-%m-%d %H:%M:%S'))
+        logger.info("   Duration: %s", duration)
+        logger.info("   Total processed: %d", self.processed)
+        logger.info("   ✅ Updated: %d", self.updated)
+        logger.info("   🆕 New records: %d", self.new_records)
+        logger.info("   ⏸️  Unchanged: %d", self.unchanged)
+        logger.info("   ❌ Failed: %d", self.failed)
+        if self.use_cache:
+            logger.info("   🗄️  Served from cache: %d", self.cache_hits)
 
         # Show success rate
         if self.processed > 0:
             success_rate = ((self.updated + self.new_records) / self.processed) * 100
-            print(f"\n   Success rate: {success_rate:.1f}%")
+            logger.info("   Success rate: %.1f%%", success_rate)
 
-        print(f"{'=' * 60}\n")
+        logger.info("=" * 60)
 
     def show_trending_coverage(self, limit=10):
-        """Show coverage with biggest engagement increase"""
-        print(f"\n📈 Top {limit} Trending Coverage (by engagement increase)")
-        print("=" * 100)
+        """Show coverage with biggest engagement increase over the trending window"""
+        logger.info("📈 Top %d Trending Coverage (by engagement increase over %d hours)",
+                    limit, TRENDING_WINDOW_HOURS)
+        logger.info("=" * 100)
 
-        conn = connect_db()
-        cur = conn.cursor()
+        cur = self.conn.cursor()
 
         try:
             # Get coverage from past N days with engagement changes
             cutoff_date = datetime.now() - timedelta(days=self.days_back)
+            baseline_time = datetime.now() - timedelta(hours=TRENDING_WINDOW_HOURS)
 
+            # Compare each current total with its last snapshot from before the
+            # window (see migrations/004); coverage with no earlier snapshot counts
+            # its whole total as the increase
             cur.execute("""
-                WITH engagement_changes AS (
-                    SELECT 
-                        cl.id,
-                        cl.client,
-                        cl.title,
-                        cl.published,
-                        ss.total_social_engagement_count as current_engagement,
-                        LAG(ss.total_social_engagement_count) OVER (
-                            PARTITION BY cl.id 
-                            ORDER BY ss.updated_at
-                        ) as previous_engagement
-                    FROM agentcy_client_coverage_log cl
-                    JOIN agentcy_client_coverage_social_shares ss ON cl.id = ss.coverage_id
-                    WHERE cl.published >= %s
-                    AND cl.deleted = false
-                )
                 SELECT 
-                    id,
-                    client,
-                    title,
-                    published,
-                    current_engagement,
-                    COALESCE(current_engagement - previous_engagement, current_engagement) as increase
-                FROM engagement_changes
-                WHERE current_engagement > 0
+                    cl.id,
+                    cl.client,
+                    cl.title,
+                    cl.published,
+                    ss.total_social_engagement_count as current_engagement,
+                    ss.total_social_engagement_count
+                        - COALESCE(baseline.total_social_engagement_count, 0) as increase
+                FROM agentcy_client_coverage_log cl
+                JOIN agentcy_client_coverage_social_shares ss ON cl.id = ss.coverage_id
+                LEFT JOIN LATERAL (
+                    SELECT h.total_social_engagement_count
+                    FROM agentcy_client_coverage_social_shares_history h
+                    WHERE h.coverage_id = cl.id
+                    AND h.recorded_at <= %s
+                    ORDER BY h.recorded_at DESC
+                    LIMIT 1
+                ) baseline ON true
+                WHERE cl.published >= %s
+                AND cl.deleted = false
+                AND ss.total_social_engagement_count > 0
                 ORDER BY increase DESC
                 LIMIT %s
-            """, (cutoff_date, limit))
+            """, (baseline_time, cutoff_date, limit))
 
             results = cur.fetchall()
 
-            print(f"{'ID':>6} {'Client':<20} {'Title':<45} {'Published':<10} {'Total':>8} {'Increase':>8}")
-            print("-" * 100)
+            logger.info("%6s %-20s %-45s %-10s %8s %8s",
+                        'ID', 'Client', 'Title', 'Published', 'Total', 'Increase')
+            logger.info("-" * 100)
 
             for row in results:
                 cov_id, client, title, published, total, increase = row
@@ -532,14 +746,14 @@ class RecentSocialSharesUpdater:
                 client_short = client[:17] + '...' if len(client) > 20 else client
                 pub_date = published.strftime('%Y-%m-%d') if published else 'N/A'
 
-                print(f"{cov_id:>6} {client_short:<20} {title_short:<45} {pub_date:<10} "
-                      f"{total:>8,} {increase:>+8,}")
+                logger.info("%6s %-20s %-45s %-10s %8d %+8d",
+                            cov_id, client_short, title_short, pub_date, total, increase)
 
         except Exception as e:
-            print(f"❌ Error fetching trending coverage: {e}")
+            logger.error("❌ Error fetching trending coverage: %s", e)
+            self.conn.rollback()
         finally:
             cur.close()
-            conn.close()
 
 
 def main():
@@ -566,6 +780,23 @@ Example cron entries:
         default=10,
         help="Look back N days for coverage to update (default: 10)"
     )
+    parser.add_argument(
+        "--min-staleness-hours",
+        type=float,
+        default=DEFAULT_MIN_STALENESS_HOURS,
+        help=f"Skip records refreshed in the last H hours (default: {DEFAULT_MIN_STALENESS_HOURS}, 0 refreshes all)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of concurrent API fetch threads (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always call the APIs instead of reusing responses cached in the last {FETCH_CACHE_TTL_HOURS} hours"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -581,29 +812,31 @@ Example cron entries:
 
     # Validate environment
     if not DATABASE_URL:
-        print("❌ Error: DATABASE_URL environment variable not set")
+        logger.error("❌ Error: DATABASE_URL environment variable not set")
         sys.exit(1)
 
     # Create and run updater
     updater = RecentSocialSharesUpdater(
         days_back=args.days,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        min_staleness_hours=args.min_staleness_hours,
+        use_cache=not args.no_cache,
+        workers=args.workers
     )
 
     try:
-        updater.run()
+        with updater:
+            updater.run()
 
-        if args.show_trending and not args.dry_run:
-            updater.show_trending_coverage()
+            if args.show_trending and not args.dry_run:
+                updater.show_trending_coverage()
 
     except KeyboardInterrupt:
-        print("\n\n⚠️  Interrupted by user")
+        logger.warning("⚠️  Interrupted by user")
         updater.show_summary(datetime.now())
         sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Fatal error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Fatal error: %s", e)
         sys.exit(1)
 
 